@@ -29,8 +29,10 @@ interface for connecting together multiple NeoTrellis boards.
 __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/georgeharker/Adafruit_CircuitPython_neotrellis.git"
 
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Callable, List, Optional, Sequence
+from typing import Callable, Dict, List, Optional, Sequence
 
 from adafruit_seesaw.neopixel import ColorType
 
@@ -41,11 +43,13 @@ from adafruit_neotrellis.neotrellis import (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class KeyEvent:
     x: int
     y: int
     edge: int  # KeypadEdge
+    # monotonic_ns() time at which the event was read from the FIFO
+    timestamp_ns: int = 0
 
 
 type CallbackType = Callable[[KeyEvent], None]
@@ -54,11 +58,23 @@ type CallbackType = Callable[[KeyEvent], None]
 class MultiTrellis:
     """Driver for multiple connected Adafruit NeoTrellis boards."""
 
+    __slots__ = ('_trelli', '_rows', '_cols', '_width', '_height',
+                 '_x_bases', '_y_bases', '_callbacks', '_key_callback',
+                 '_dispatching')
+
     _trelli: List[List[NeoTrellis]]
     _rows: int
     _cols: int
-    _key_pads: List[List[NeoTrellis]]
-    _callbacks: List[List[Optional[CallbackType]]]
+    _width: int
+    _height: int
+    # x_base of each board column and y_base of each board row
+    _x_bases: array
+    _y_bases: array
+    # Callbacks keyed by y * width + x, only for keys that have one
+    _callbacks: Dict[int, CallbackType]
+    _key_callback: Callable[[NeoTrellis, SeesawKeyEvent], None]
+    # Board whose event is being handled, for press-to-light latency
+    _dispatching: Optional[NeoTrellis]
 
     def __init__(self, neotrellis_array: List[List[NeoTrellis]]):
         self._trelli = neotrellis_array
@@ -91,27 +107,27 @@ class MultiTrellis:
 
         self._width = col_size_sum[self._cols - 1]
         self._height = row_size_sum[self._rows - 1]
-        self._key_pads: List[List[NeoTrellis]] = []
-        self._callbacks: List[List[Optional[CallbackType]]] = [
-            [None for _ in range(self._width)] for _ in range(self._height)
-        ]
-
-        for _y in range(self._height):
-            self._key_pads.append([])
-        for py in range(self._rows):
-            for px in range(self._cols):
-                t = self._trelli[py][px]
-                for ky in range(t.height):
-                    y = t.y_base + ky
-                    for _kx in range(t.width):
-                        self._key_pads[y].append(t)
-
-    @staticmethod
-    def _callback_wrapper(t: NeoTrellis,
-                          event: SeesawKeyEvent,
-                          cb: CallbackType) -> None:
+        self._x_bases = array('H', (t.x_base for t in self._trelli[0]))
+        self._y_bases = array('H', (r[0].y_base for r in self._trelli))
+        self._callbacks = {}
+        # Shared by every key so no per-key closure is needed
+        self._key_callback = self._callback_wrapper
+        self._dispatching = None
+
+    def _check_xy(self, x: int, y: int) -> None:
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise IndexError("key ({}, {}) out of range".format(x, y))
+
+    def _callback_wrapper(self, t: NeoTrellis,
+                          event: SeesawKeyEvent) -> None:
         x, y = t.key_xy(event.number)
-        cb(KeyEvent(x=x, y=y, edge=event.edge))
+        cb = self._callbacks.get(y * self._width + x)
+        if cb is not None:
+            self._dispatching = t
+            try:
+                cb(KeyEvent(x=x, y=y, edge=event.edge, timestamp_ns=t.event_time_ns))
+            finally:
+                self._dispatching = None
 
     @property
     def width(self):
@@ -136,7 +152,9 @@ class MultiTrellis:
         return self._trelli[subscript]
 
     def get_keypad(self, x: int, y: int) -> NeoTrellis:
-        return self._key_pads[y][x]
+        self._check_xy(x, y)
+        return self._trelli[bisect_right(self._y_bases, y) - 1][
+            bisect_right(self._x_bases, x) - 1]
 
     @property
     def interrupt_enabled(self) -> bool:
@@ -152,6 +170,20 @@ class MultiTrellis:
             for px in range(self._cols):
                 self._trelli[py][px].interrupt_enabled = enabled
 
+    @property
+    def speculative_read(self) -> bool:
+        for py in range(self._rows):
+            for px in range(self._cols):
+                if not self._trelli[py][px].speculative_read:
+                    return False
+        return True
+
+    @speculative_read.setter
+    def speculative_read(self, enabled: bool) -> None:
+        for py in range(self._rows):
+            for px in range(self._cols):
+                self._trelli[py][px].speculative_read = enabled
+
     def activate_key(self, x: int, y:
                      int, edge:  # KeypadEdge
                      int, enable: bool = True):
@@ -160,26 +192,34 @@ class MultiTrellis:
         edge to register an event on and can be NeoTrellis.EDGE_FALLING or
         NeoTrellis.EDGE_RISING. enable should be set to True if the event is
         to be enabled, or False if the event is to be disabled."""
-        pad = self._key_pads[y][x]
+        pad = self.get_keypad(x, y)
         pad.activate_key(pad.key_index(x, y), edge, enable)
 
-    def set_callback(self, x: int, y: int, function: CallbackType):
+    def set_callback(self, x: int, y: int, function: Optional[CallbackType]):
         """Set a callback function for when an event for the key at index x, y
-        (measured from the top lefthand corner) is detected."""
-        pad = self._key_pads[y][x]
-        self._callbacks[y][x] = function
-        pad.callbacks[pad.key_index(x, y)] = lambda t, e: self._callback_wrapper(t, e, function)
+        (measured from the top lefthand corner) is detected.  Passing None
+        removes the callback."""
+        pad = self.get_keypad(x, y)
+        if function is None:
+            self._callbacks.pop(y * self._width + x, None)
+            pad.callbacks[pad.key_index(x, y)] = None
+        else:
+            self._callbacks[y * self._width + x] = function
+            pad.callbacks[pad.key_index(x, y)] = self._key_callback
 
     def get_callback(self, x: int, y: int) -> Optional[CallbackType]:
         """Get a callback function for when an event for the key at index x, y
         (measured from the top lefthand corner) is detected."""
-        return self._callbacks[y][x]
+        self._check_xy(x, y)
+        return self._callbacks.get(y * self._width + x)
 
     def color(self, x: int, y: int, color: ColorType):
         """Set the color of the pixel at index x, y measured from the top
         lefthand corner of the matrix"""
-        pad = self._key_pads[y][x]
-        pad.pixels[pad.key_index(x, y)] = color
+        pad = self.get_keypad(x, y)
+        if self._dispatching is not None:
+            pad.take_pending_latency(self._dispatching)
+        pad.color(pad.key_index(x, y), color)
 
     @property
     def data_pending(self) -> bool:
@@ -196,6 +236,25 @@ class MultiTrellis:
             for px in range(self._cols):
                 self._trelli[py][px].sync()
 
+    def show(self) -> None:
+        """Commit the pixels of all trellis boards in the matrix"""
+        for py in range(self._rows):
+            for px in range(self._cols):
+                self._trelli[py][px].show()
+
+    def latency_percentiles(self, percentiles: Sequence[int] = (50, 90, 99)
+                            ) -> List[List[List[int]]]:
+        """Return the press-to-light latency percentiles of each board,
+           indexed like the neotrellis_array passed to the constructor"""
+        return [[t.latency_percentiles(percentiles) for t in row]
+                for row in self._trelli]
+
+    def reset_latency(self) -> None:
+        """Discard the recorded press-to-light latencies of all boards"""
+        for py in range(self._rows):
+            for px in range(self._cols):
+                self._trelli[py][px].reset_latency()
+
     def pixels_updated(self) -> None:
         """To be called after pixels are updated"""
         pass
@@ -50,7 +50,9 @@ __version__ = "0.0.0-auto.0"
 __repo__ = "https://github.com/georgeharker/Adafruit_CircuitPython_neotrellis.git"
 
 
-from time import sleep
+from array import array
+from math import ceil
+from time import monotonic_ns, sleep
 from typing import Callable, List, Optional, Sequence, Tuple
 
 from adafruit_seesaw.keypad import (
@@ -74,9 +76,41 @@ _NEO_TRELLIS_NUM_KEYS = const(64)
 SYNC_DELAY = const(0.0005)
 INIT_DELAY = const(0.0005)
 
+# Bounds for the number of FIFO records fetched by a speculative read
+_SPECULATIVE_MIN_READ = const(2)
+_SPECULATIVE_MAX_READ = const(16)
+# Records read by one speculative sync before leaving the rest for the next
+_SPECULATIVE_MAX_DRAIN = const(32)
+
 type CallbackType = Callable[['NeoTrellis', KeyEvent], None]
 
 
+class _TrellisNeoPixel(NeoPixel):
+    """NeoPixel that tells its NeoTrellis about pixel writes and commits,
+       for press-to-light latency.  With auto_write the pixel buffer calls
+       show() itself, so every commit passes through here."""
+
+    def __init__(self, trellis: NeoTrellis, pin: int, n: int):
+        self._trellis = trellis
+        super().__init__(trellis, pin, n)
+
+    def __setitem__(self, index, val) -> None:
+        self._trellis.pixels_written()
+        super().__setitem__(index, val)
+
+    def fill(self, color: ColorType) -> None:
+        self._trellis.pixels_written()
+        super().fill(color)
+
+    def update(self, updates: Sequence[Tuple[int, ColorType]]) -> None:
+        self._trellis.pixels_written()
+        super().update(updates)
+
+    def show(self) -> None:
+        super().show()
+        self._trellis.pixels_committed()
+
+
 class NeoTrellis(Keypad):
     """Driver for the Adafruit NeoTrellis."""
 
@@ -88,21 +122,40 @@ class NeoTrellis(Keypad):
     pad_y: int
     callbacks: List[Optional[CallbackType]]
     pixels: NeoPixel
+    speculative_read: bool
+    _read_size: int
+    # monotonic_ns() time at which the most recent events were read
+    event_time_ns: int
+    # Read time of the oldest event not yet followed by a pixel commit
+    _pending_ns: int
+    # Whether a pixel was written since the last event was dispatched
+    _pixels_written: bool
+    _latencies: Optional[array]
+    _latency_count: int
 
     def __init__(self, i2c_bus, interrupt: bool = False,
                  addr: int = _NEO_TRELLIS_ADDR, drdy=None,
                  width: int = _NEO_TRELLIS_NUM_COLS,
                  height: int = _NEO_TRELLIS_NUM_ROWS,
                  x_base: int = 0, y_base: int = 0,
-                 pad_x: int = 0, pad_y: int = 0):
+                 pad_x: int = 0, pad_y: int = 0,
+                 speculative_read: bool = False,
+                 latency_samples: int = 0):
         super().__init__(i2c_bus, addr, drdy)
         self.width = width
         self.height = height
         self.x_base = x_base
         self.y_base = y_base
         self.interrupt_enabled = interrupt
-        self.callbacks = [None] * _NEO_TRELLIS_NUM_KEYS
-        self.pixels = NeoPixel(self, _NEO_TRELLIS_NEOPIX_PIN, self.width * self.height)
+        self.speculative_read = speculative_read
+        self._read_size = _SPECULATIVE_MIN_READ
+        self.callbacks = [None] * (self.width * self.height)
+        self.event_time_ns = 0
+        self._pending_ns = 0
+        self._pixels_written = False
+        self._latencies = array('Q', bytes(8 * latency_samples)) if latency_samples else None
+        self._latency_count = 0
+        self.pixels = _TrellisNeoPixel(self, _NEO_TRELLIS_NEOPIX_PIN, self.width * self.height)
         sleep(INIT_DELAY)
 
     def activate_key(self, key:
@@ -129,22 +182,113 @@ class NeoTrellis(Keypad):
     def show(self) -> None:
         self.pixels.show()
 
+    def pixels_written(self) -> None:
+        """Called by pixels when any pixel is written"""
+        self._pixels_written = True
+
+    def pixels_committed(self) -> None:
+        """Called by pixels when they are shown.  Records the press-to-light
+           latency of the oldest event that lit a pixel since the previous
+           commit."""
+        if self._pending_ns:
+            latencies = self._latencies
+            latencies[self._latency_count % len(latencies)] = monotonic_ns() - self._pending_ns
+            self._latency_count += 1
+            self._pending_ns = 0
+
+    def release_pending_latency(self) -> int:
+        """Clear and return the read time of the oldest event awaiting a
+           pixel commit, or 0 if there is none"""
+        start_ns = self._pending_ns
+        self._pending_ns = 0
+        return start_ns
+
+    def take_pending_latency(self, source: NeoTrellis) -> None:
+        """Move the pending press-to-light latency start of source to this
+           board, for an event on source that lights a pixel on this board"""
+        if source is self:
+            return
+        start_ns = source.release_pending_latency()
+        if start_ns and self._latencies is not None and (
+            not self._pending_ns or start_ns < self._pending_ns
+        ):
+            self._pending_ns = start_ns
+
+    def latency_percentiles(self, percentiles: Sequence[int] = (50, 90, 99)) -> List[int]:
+        """Return the press-to-light latency in nanoseconds at each of the
+           given percentiles, measured from the time an event was read from the
+           FIFO to the next pixel commit of this board.  An event whose
+           callback writes no pixel is not recorded.  Events lighting another board are only followed through
+           MultiTrellis.color from a MultiTrellis callback, and are recorded
+           on the board that is lit.  Latency is only recorded when the board
+           was created with latency_samples, and the most recent
+           latency_samples commits are kept.  Returns an empty list if nothing
+           has been recorded."""
+        if self._latencies is None or not self._latency_count:
+            return []
+        samples = sorted(self._latencies[:min(self._latency_count, len(self._latencies))])
+        n = len(samples)
+        # Nearest rank
+        return [samples[max(0, ceil(p * n / 100) - 1)] for p in percentiles]
+
+    def reset_latency(self) -> None:
+        """Discard any recorded press-to-light latencies"""
+        self._pending_ns = 0
+        self._latency_count = 0
+
     def sync(self) -> None:
         """read any events from the Trellis hardware and call associated
            callbacks"""
+        if self.speculative_read:
+            self._sync_speculative()
+            return
         available = self.count
         sleep(SYNC_DELAY)       # FIXME: resolve
         if available > 0:
-            buf = self.read_keypad(available)
-            for r in buf:
-                if r.response_type == ResponseType.TYPE_KEY:
-                    evt = r.data_keyevent()
-                    callback = self.callbacks[evt.number]
-                    if (
-                        callback is not None and
-                        evt.number < _NEO_TRELLIS_NUM_KEYS
-                    ):
-                        callback(self, evt)
+            self._dispatch(self.read_keypad(available))
+
+    def _sync_speculative(self) -> None:
+        """read a fixed size chunk of the FIFO without querying the count
+           first, discarding the empty records returned when fewer events are
+           queued.  The chunk size grows while reads come back full and shrinks
+           back towards the minimum when they do not.  At most
+           _SPECULATIVE_MAX_DRAIN records are read per sync."""
+        drained = 0
+        while drained < _SPECULATIVE_MAX_DRAIN:
+            size = self._read_size
+            valid = self._dispatch(self.read_keypad(size))
+            drained += size
+            if valid < size:
+                if valid <= size // 2 and size > _SPECULATIVE_MIN_READ:
+                    self._read_size = size - 1
+                return
+            # The chunk was full, so more events may still be queued
+            if size < _SPECULATIVE_MAX_READ:
+                self._read_size = min(size * 2, _SPECULATIVE_MAX_READ)
+
+    def _dispatch(self, buf) -> int:
+        """call the callbacks for the key events in buf, returning the number
+           of key event records found"""
+        self.event_time_ns = now = monotonic_ns()
+        valid = 0
+        for r in buf:
+            if r.response_type == ResponseType.TYPE_KEY:
+                valid += 1
+                evt = r.data_keyevent()
+                if evt.number >= len(self.callbacks):
+                    continue
+                callback = self.callbacks[evt.number]
+                if callback is not None:
+                    # Set before the callback, which may commit its pixel
+                    started = self._latencies is not None and not self._pending_ns
+                    if started:
+                        self._pending_ns = now
+                        self._pixels_written = False
+                    callback(self, evt)
+                    if started and not self._pixels_written:
+                        # Nothing was lit, so there is no commit to measure against
+                        self._pending_ns = 0
+        return valid
 
     def local_key_index(self, x: int, y: int) -> int:
         return int(y * self.width + x)
@@ -0,0 +1,49 @@
+import time
+
+from board import SCL, SDA
+import busio
+from adafruit_neotrellis.neotrellis import NeoTrellis
+from adafruit_neotrellis.multitrellis import MultiTrellis
+
+# create the i2c object for the trellis
+i2c_bus = busio.I2C(SCL, SDA)
+
+# keep the latency of the last 64 pixel commits on each board
+trelli = [
+    [
+        NeoTrellis(i2c_bus, False, addr=0x2E, latency_samples=64),
+        NeoTrellis(i2c_bus, False, addr=0x2F, latency_samples=64),
+    ],
+]
+
+trellis = MultiTrellis(trelli)
+
+OFF = (0, 0, 0)
+BLUE = (0, 0, 255)
+
+
+# light the key while it is pressed
+def light(event):
+    if event.edge == NeoTrellis.EDGE_RISING:
+        trellis.color(event.x, event.y, BLUE)
+    elif event.edge == NeoTrellis.EDGE_FALLING:
+        trellis.color(event.x, event.y, OFF)
+
+
+for y in range(trellis.height):
+    for x in range(trellis.width):
+        trellis.activate_key(x, y, NeoTrellis.EDGE_RISING)
+        trellis.activate_key(x, y, NeoTrellis.EDGE_FALLING)
+        trellis.set_callback(x, y, light)
+
+last_report = time.monotonic()
+while True:
+    # the pixels auto write, so each color() call in a callback is a commit
+    trellis.sync()
+    if time.monotonic() - last_report > 5:
+        last_report = time.monotonic()
+        # p50, p90 and p99 press-to-light latency of each board in microseconds
+        for py, row in enumerate(trellis.latency_percentiles()):
+            for px, percentiles in enumerate(row):
+                print(px, py, [ns // 1000 for ns in percentiles])
+    time.sleep(0.02)
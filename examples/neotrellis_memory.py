@@ -0,0 +1,46 @@
+import tracemalloc
+
+from board import SCL, SDA
+import busio
+from adafruit_neotrellis.neotrellis import NeoTrellis
+from adafruit_neotrellis.multitrellis import MultiTrellis
+
+# create the i2c object for the trellis
+i2c_bus = busio.I2C(SCL, SDA)
+
+# addresses of the connected boards, one list per row of boards
+ADDRESSES = [
+    [0x2E, 0x2F],
+    [0x30, 0x31],
+]
+
+
+def blink(event):
+    print(event.x, event.y, event.edge)
+
+
+def allocated():
+    return tracemalloc.get_traced_memory()[0]
+
+
+boards = sum(len(row) for row in ADDRESSES)
+
+tracemalloc.start()
+before = allocated()
+trelli = [[NeoTrellis(i2c_bus, False, addr=addr) for addr in row] for row in ADDRESSES]
+after_boards = allocated()
+trellis = MultiTrellis(trelli)
+after_multi = allocated()
+for y in range(trellis.height):
+    for x in range(trellis.width):
+        trellis.set_callback(x, y, blink)
+after_callbacks = allocated()
+tracemalloc.stop()
+
+print("boards:", boards)
+print("bytes per board:", (after_boards - before) // boards)
+print("multitrellis bytes per board:", (after_multi - after_boards) // boards)
+print(
+    "callback bytes per key:",
+    (after_callbacks - after_multi) // (trellis.width * trellis.height),
+)
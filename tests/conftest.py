@@ -0,0 +1,120 @@
+"""
+Simulated seesaw bus for exercising NeoTrellis without hardware.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from adafruit_pixelbuf import PixelBuf
+from adafruit_seesaw.keypad import Keypad, ResponseType
+from adafruit_seesaw.neopixel import NeoPixel
+
+from adafruit_neotrellis import neotrellis
+from adafruit_neotrellis.neotrellis import NeoTrellis
+
+
+class Record:
+    """A FIFO record as returned by read_keypad"""
+
+    def __init__(self, response_type, number: int = 0, edge: int = 0):
+        self.response_type = response_type
+        self._event = SimpleNamespace(number=number, edge=edge)
+
+    def data_keyevent(self):
+        return self._event
+
+
+def key_record(number: int, edge: int = NeoTrellis.EDGE_RISING) -> Record:
+    return Record(ResponseType.TYPE_KEY, number, edge)
+
+
+# The seesaw marks FIFO slots beyond the queued events as invalid
+EMPTY_RECORD = Record(ResponseType.TYPE_INVALID)
+
+# Nominal time taken by one I2C register transaction
+BUS_TRANSACTION_NS = 500_000
+
+# Lines printed in the terminal summary, e.g. strategy comparisons
+REPORT = []
+
+
+class Clock:
+    """A monotonic_ns() that only moves when told to, or when the simulated
+       bus sleeps or runs a transaction"""
+
+    def __init__(self):
+        self.now = 1
+
+    def __call__(self) -> int:
+        return self.now
+
+    def advance_ms(self, ms: int) -> None:
+        self.now += ms * 1_000_000
+
+    def sleep(self, seconds: float) -> None:
+        self.now += int(seconds * 1_000_000_000)
+
+
+_clock = Clock()
+
+
+class FakeTrellis(NeoTrellis):
+    """NeoTrellis whose keypad FIFO lives in memory.  Every count query and
+       FIFO read is counted as one bus transaction."""
+
+    fifo: list
+    transactions: int
+
+    def __init__(self, *args, **kwargs):
+        self.fifo = []
+        self.transactions = 0
+        self._interrupt = False
+        super().__init__(None, *args, **kwargs)
+
+    @property
+    def interrupt_enabled(self) -> bool:
+        return self._interrupt
+
+    @interrupt_enabled.setter
+    def interrupt_enabled(self, enabled: bool) -> None:
+        self._interrupt = enabled
+
+    def _transaction(self) -> None:
+        self.transactions += 1
+        _clock.now += BUS_TRANSACTION_NS
+
+    @property
+    def count(self) -> int:
+        self._transaction()
+        return len(self.fifo)
+
+    def read_keypad(self, num: int) -> list:
+        self._transaction()
+        buf, self.fifo = self.fifo[:num], self.fifo[num:]
+        return buf + [EMPTY_RECORD] * (num - len(buf))
+
+
+@pytest.fixture(autouse=True)
+def simulated_bus(monkeypatch) -> Clock:
+    _clock.now = 1
+    monkeypatch.setattr(Keypad, "__init__", lambda self, i2c_bus, addr, drdy: None)
+    # Keep the real pixel buffer, auto_write included, but skip the bus
+    monkeypatch.setattr(NeoPixel, "__init__", lambda self, seesaw, pin, n: PixelBuf.__init__(
+        self, n, byteorder="GRB", auto_write=True))
+    monkeypatch.setattr(NeoPixel, "_transmit", lambda self, buffer: None)
+    monkeypatch.setattr(neotrellis, "sleep", _clock.sleep)
+    monkeypatch.setattr(neotrellis, "monotonic_ns", _clock)
+    return _clock
+
+
+@pytest.fixture
+def clock(simulated_bus) -> Clock:
+    return simulated_bus
+
+
+def pytest_terminal_summary(terminalreporter):
+    if REPORT:
+        terminalreporter.section("simulated bus")
+        for line in REPORT:
+            terminalreporter.write_line(line)
@@ -0,0 +1,124 @@
+from adafruit_neotrellis.multitrellis import MultiTrellis
+
+from conftest import FakeTrellis, key_record
+
+MS = 1_000_000
+
+
+def test_callback_lighting_own_led(clock):
+    trellis = FakeTrellis(latency_samples=8)
+
+    def light(t, event):
+        clock.advance_ms(50)
+        t.color(event.number, (0, 0, 255))
+
+    trellis.callbacks[3] = light
+    for _ in range(2):
+        trellis.fifo = [key_record(3)]
+        trellis.sync()
+        clock.advance_ms(1000)
+        trellis.sync()
+    assert trellis.latency_percentiles((50, 100)) == [50 * MS, 50 * MS]
+    assert trellis.event_time_ns
+
+
+def test_show_after_sync_without_auto_write(clock):
+    trellis = FakeTrellis(latency_samples=8)
+    trellis.pixels.auto_write = False
+    trellis.callbacks[3] = lambda t, e: t.color(e.number, (0, 0, 255))
+    trellis.fifo = [key_record(3)]
+    trellis.sync()
+    clock.advance_ms(20)
+    trellis.show()
+    assert trellis.latency_percentiles((50,)) == [20 * MS]
+
+
+def test_event_lighting_nothing_is_not_recorded(clock):
+    trellis = FakeTrellis(latency_samples=8)
+    trellis.callbacks[3] = lambda t, e: None
+    trellis.fifo = [key_record(3)]
+    trellis.sync()
+    clock.advance_ms(1000)
+    trellis.color(0, (1, 1, 1))
+    assert trellis.latency_percentiles() == []
+
+
+def test_multitrellis_cross_board_latency(clock):
+    m = MultiTrellis([[FakeTrellis(width=4, height=4, latency_samples=8)
+                       for _ in range(2)]])
+    a, b = m[0]
+    timestamps = []
+
+    def light_other_board(event):
+        timestamps.append(event.timestamp_ns)
+        clock.advance_ms(30)
+        m.color(event.x + 4, event.y, (0, 0, 255))
+
+    m.set_callback(1, 1, light_other_board)
+    a.fifo = [key_record(a.key_index(1, 1))]
+    m.sync()
+    assert timestamps == [a.event_time_ns]
+    clock.advance_ms(1000)
+    a.color(0, (1, 1, 1))
+    assert a.latency_percentiles() == []
+    assert b.latency_percentiles((50,)) == [30 * MS]
+    assert m.latency_percentiles((50,)) == [[[], [30 * MS]]]
+
+
+def test_direct_pixel_write(clock):
+    trellis = FakeTrellis(latency_samples=8)
+
+    def light(t, event):
+        clock.advance_ms(40)
+        t.pixels[event.number] = (0, 255, 255)
+
+    trellis.callbacks[3] = light
+    trellis.fifo = [key_record(3)]
+    trellis.sync()
+    assert trellis.latency_percentiles((50,)) == [40 * MS]
+
+
+def test_event_lighting_nothing_without_auto_write(clock):
+    trellis = FakeTrellis(latency_samples=8)
+    trellis.pixels.auto_write = False
+    trellis.callbacks[3] = lambda t, e: None
+    trellis.fifo = [key_record(3)]
+    trellis.sync()
+    clock.advance_ms(5000)
+    trellis.show()
+    assert trellis.latency_percentiles() == []
+
+
+def test_only_lit_events_are_recorded(clock):
+    trellis = FakeTrellis(latency_samples=8)
+
+    def light(t, event):
+        clock.advance_ms(10)
+        t.color(event.number, (0, 0, 255))
+
+    trellis.callbacks[3] = light
+    trellis.callbacks[4] = lambda t, e: None
+    trellis.fifo = [key_record(3), key_record(4)]
+    trellis.sync()
+    clock.advance_ms(1000)
+    trellis.color(0, (1, 1, 1))
+    assert trellis.latency_percentiles((0, 100)) == [10 * MS, 10 * MS]
+
+
+def test_percentiles_nearest_rank(clock):
+    trellis = FakeTrellis(latency_samples=8)
+    delays = iter([20, 10, 40, 30])
+
+    def light(t, event):
+        clock.advance_ms(next(delays))
+        t.color(event.number, (0, 0, 255))
+
+    trellis.callbacks[3] = light
+    for _ in range(2):
+        trellis.fifo = [key_record(3)]
+        trellis.sync()
+    assert trellis.latency_percentiles((0, 50, 51, 100)) == [10 * MS, 10 * MS, 20 * MS, 20 * MS]
+    for _ in range(2):
+        trellis.fifo = [key_record(3)]
+        trellis.sync()
+    assert trellis.latency_percentiles((25, 50, 75, 99)) == [10 * MS, 20 * MS, 30 * MS, 40 * MS]
@@ -0,0 +1,65 @@
+import pytest
+
+from adafruit_neotrellis.multitrellis import MultiTrellis
+
+from conftest import FakeTrellis, key_record
+
+
+def _multitrellis() -> MultiTrellis:
+    return MultiTrellis([[FakeTrellis(width=4, height=4) for _ in range(2)]
+                         for _ in range(2)])
+
+
+def test_get_keypad():
+    m = _multitrellis()
+    assert m.get_keypad(5, 2) is m[0][1]
+    assert m.get_keypad(3, 6) is m[1][0]
+    assert m.get_keypad(7, 7) is m[1][1]
+
+
+@pytest.mark.parametrize("x, y", [(8, 0), (0, 8), (-1, 0), (0, -1)])
+def test_out_of_range_keys_raise(x, y):
+    m = _multitrellis()
+    with pytest.raises(IndexError):
+        m.get_keypad(x, y)
+    with pytest.raises(IndexError):
+        m.set_callback(x, y, print)
+    with pytest.raises(IndexError):
+        m.get_callback(x, y)
+    with pytest.raises(IndexError):
+        m.color(x, y, (0, 0, 0))
+    assert all(cb is None for row in m for t in row for cb in t.callbacks)
+
+
+def test_callbacks():
+    m = _multitrellis()
+    seen = []
+    m.set_callback(5, 6, seen.append)
+    assert m.get_callback(5, 6) == seen.append
+    assert m.get_callback(6, 5) is None
+    board = m[1][1]
+    assert board.callbacks[board.key_index(5, 6)] is not None
+    assert board.callbacks[0] is None
+    board.fifo = [key_record(board.key_index(5, 6)), key_record(0)]
+    m.sync()
+    assert [(e.x, e.y) for e in seen] == [(5, 6)]
+
+
+def test_clear_callback():
+    m = _multitrellis()
+    m.set_callback(5, 6, print)
+    m.set_callback(5, 6, None)
+    board = m[1][1]
+    assert m.get_callback(5, 6) is None
+    assert board.callbacks[board.key_index(5, 6)] is None
+    assert not m._callbacks
+
+
+def test_get_keypad_uneven_boards():
+    m = MultiTrellis([[FakeTrellis(width=4, height=2), FakeTrellis(width=8, height=2)],
+                      [FakeTrellis(width=4, height=8), FakeTrellis(width=8, height=8)]])
+    assert (m.width, m.height) == (12, 10)
+    assert m.get_keypad(3, 1) is m[0][0]
+    assert m.get_keypad(4, 1) is m[0][1]
+    assert m.get_keypad(3, 2) is m[1][0]
+    assert m.get_keypad(11, 9) is m[1][1]
@@ -0,0 +1,89 @@
+from adafruit_neotrellis.neotrellis import _SPECULATIVE_MAX_DRAIN
+
+from conftest import REPORT, FakeTrellis, key_record
+
+
+def _trellis(speculative_read: bool) -> FakeTrellis:
+    trellis = FakeTrellis(speculative_read=speculative_read)
+    trellis.seen = []
+    for key in range(trellis.width * trellis.height):
+        trellis.callbacks[key] = lambda t, e: t.seen.append(e.number)
+    return trellis
+
+
+def _sync(trellis: FakeTrellis, events: int) -> int:
+    """queue events and sync, returning the bus transactions used"""
+    trellis.fifo += [key_record(k % 64) for k in range(events)]
+    before = trellis.transactions
+    trellis.sync()
+    return trellis.transactions - before
+
+
+def test_speculative_read_grows_and_drains_backlog():
+    trellis = _trellis(True)
+    # 2 + 4 + 8 + 16 full reads, then a partial read of 16
+    assert _sync(trellis, 40) == 5
+    assert trellis.seen == [k % 64 for k in range(40)]
+    assert not trellis.fifo
+    # The grown chunk now takes a burst in one read
+    assert _sync(trellis, 10) == 1
+
+
+def test_speculative_read_shrinks_after_sparse_reads():
+    trellis = _trellis(True)
+    _sync(trellis, 40)
+    for _ in range(16):
+        assert _sync(trellis, 1) == 1
+    # Back to the minimum chunk, so a burst of 3 needs a second read
+    assert _sync(trellis, 3) == 2
+    assert len(trellis.seen) == 40 + 16 + 3
+
+
+def test_speculative_read_skips_invalid_records():
+    trellis = _trellis(True)
+    trellis.fifo = [key_record(200), key_record(3)]
+    trellis.sync()
+    assert trellis.seen == [3]
+    assert not trellis.fifo
+
+
+def test_speculative_read_bounds_drain():
+    class Streaming(FakeTrellis):
+        def read_keypad(self, num: int) -> list:
+            # Events keep arriving faster than they are read
+            self.fifo += [key_record(0)] * num
+            return super().read_keypad(num)
+
+    trellis = Streaming(speculative_read=True)
+    trellis.seen = []
+    trellis.callbacks[0] = lambda t, e: t.seen.append(e.number)
+    # Every chunk comes back full, but sync still returns
+    assert _sync(trellis, 0) == 5
+    assert _SPECULATIVE_MAX_DRAIN <= len(trellis.seen) < 2 * _SPECULATIVE_MAX_DRAIN
+
+
+def test_sync_strategies_on_simulated_bus(clock):
+    # Bursts of queued events between syncs, including idle polls
+    bursts = [0, 1, 0, 2, 1, 0, 5, 1, 0, 20, 3, 1, 0, 0, 2] * 4
+    results = {}
+    for speculative in (False, True):
+        trellis = _trellis(speculative)
+        start = clock.now
+        for burst in bursts:
+            _sync(trellis, burst)
+        assert not trellis.fifo
+        results[speculative] = (trellis.transactions, clock.now - start, trellis.seen)
+        REPORT.append(
+            "{:<16} {:4d} transactions, {:7.2f} ms bus and sleep time over {} syncs".format(
+                "speculative" if speculative else "count then read",
+                trellis.transactions, (clock.now - start) / 1_000_000, len(bursts)))
+
+    (count_transactions, count_ns, count_seen), (spec_transactions, spec_ns, spec_seen) = (
+        results[False], results[True])
+    # Neither strategy misses or reorders events
+    assert spec_seen == count_seen == [k % 64 for b in bursts for k in range(b)]
+    # The count strategy pays two transactions whenever events are queued
+    busy = sum(1 for burst in bursts if burst)
+    assert count_transactions == len(bursts) + busy
+    assert spec_transactions < count_transactions
+    assert spec_ns < count_ns